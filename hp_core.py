@@ -0,0 +1,411 @@
+# hp_core.py — TESPy heat pump model and built-in compressor maps (no Streamlit)
+from __future__ import annotations
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# TESPy and CoolProp pull in SciPy and compiled extensions; they are imported
+# at first use so that importing this module (and Streamlit cold start) stays cheap.
+
+# ===========================
+# 1) Built-in compressor maps
+# ===========================
+# Paste the real arrays from "SOLID_Compressor data_SSL.xlsm".
+# Each map MUST provide "PR" and "ETA_S". Optional "MDOT".
+# Units:
+#   - PR: absolute pressure ratio (p_out/p_in)
+#   - ETA_S: isentropic efficiency (0..1)
+#   - MDOT: kg/s (optional; only used as a hint, not a hard constraint)
+BUILTIN_COMPRESSOR_MAPS: Dict[str, Dict[str, list]] = {
+    # ---> REPLACE THESE PLACEHOLDERS WITH YOUR REAL DATA <---
+    "Solid_Default": {
+        "PR":    [1.2, 1.5, 2.0, 2.5, 3.0, 3.5],       # example values
+        "ETA_S": [0.68, 0.73, 0.78, 0.80, 0.79, 0.76], # example values
+        # "MDOT": [0.15, 0.16, 0.17, 0.165, 0.155, 0.14],  # optional
+    },
+    # Example second curve if you have speed variants:
+    "Solid_50Hz": {
+        "PR":    [1.2, 1.6, 2.1, 2.6, 3.1],
+        "ETA_S": [0.65, 0.72, 0.77, 0.79, 0.78],
+    },
+}
+
+def _interp(x, xp, fp):
+    # xp is sorted by from_name and np.interp already holds the end values
+    # outside [xp[0], xp[-1]], so no explicit clip is needed.
+    return float(np.interp(x, xp, fp))
+
+class StaticCompressorMap:
+    """Simple PR→ηs (and optional PR→mdot) interpolator using built-in arrays."""
+    __slots__ = ("pr_vals", "eta_vals", "mdot_vals")
+
+    def __init__(self, pr_vals, eta_vals, mdot_vals=None):
+        self.pr_vals = np.ascontiguousarray(pr_vals, dtype=np.float64)
+        self.eta_vals = np.ascontiguousarray(eta_vals, dtype=np.float64)
+        self.mdot_vals = None if mdot_vals is None else np.ascontiguousarray(mdot_vals, dtype=np.float64)
+
+    @classmethod
+    def from_name(cls, name: str) -> "StaticCompressorMap":
+        cmap = _PRECOMPILED_MAPS.get(name)
+        return cmap if cmap is not None else cls._build(name)
+
+    @classmethod
+    def _build(cls, name: str) -> "StaticCompressorMap":
+        if name not in BUILTIN_COMPRESSOR_MAPS:
+            raise ValueError(f"Unknown compressor map '{name}'")
+        data = BUILTIN_COMPRESSOR_MAPS[name]
+        if "PR" not in data or "ETA_S" not in data:
+            raise ValueError(f"Map '{name}' must define PR and ETA_S arrays.")
+        pr = np.array(data["PR"], dtype=float)
+        eta = np.array(data["ETA_S"], dtype=float)
+        sort_idx = np.argsort(pr)
+        pr = pr[sort_idx]
+        eta = eta[sort_idx]
+        mdot = None
+        if "MDOT" in data and data["MDOT"] is not None:
+            md = np.array(data["MDOT"], dtype=float)[sort_idx]
+            mdot = md
+        return cls(pr, eta, mdot)
+
+    def eta_s(self, pr: float, default_eta: float) -> float:
+        return _interp(pr, self.pr_vals, self.eta_vals) if len(self.pr_vals) else default_eta
+
+    def eta_s_many(self, prs: np.ndarray, default_eta: float) -> np.ndarray:
+        """Vectorized eta_s for several pressure ratios in a single np.interp call."""
+        if not len(self.pr_vals):
+            return np.full(len(prs), default_eta)
+        return np.interp(prs, self.pr_vals, self.eta_vals)
+
+    def mdot_hint(self, pr: float, default_mdot: Optional[float]) -> Optional[float]:
+        if self.mdot_vals is None or len(self.pr_vals) == 0:
+            return default_mdot
+        return _interp(pr, self.pr_vals, self.mdot_vals)
+
+# Built-in maps are literal, so sort and convert them once at import.
+_PRECOMPILED_MAPS: Dict[str, StaticCompressorMap] = {
+    name: StaticCompressorMap._build(name) for name in BUILTIN_COMPRESSOR_MAPS
+}
+
+# ===========================
+# 2) TESPy model
+# ===========================
+MAP_ETA_TOL = 1e-4   # stop re-solving once the map changes eta_s by less than this
+MAP_MAX_ITER = 3     # cap on extra offdesign solves for the map fixed point
+
+def c_to_k(t_c: float) -> float:
+    return t_c + 273.15
+
+@lru_cache(maxsize=None)
+def _fluid_state(fluid: str):
+    """One CoolProp HEOS AbstractState per fluid, reused by the saturation helpers."""
+    from CoolProp.CoolProp import AbstractState
+    return AbstractState("HEOS", fluid)
+
+# Streamlit serves each session on its own thread; update() and the reads
+# that follow must not interleave on the shared per-fluid state.
+_fluid_state_lock = threading.Lock()
+
+# Saturation lookups repeat with the same (fluid, T) across runs; T is
+# quantized to 0.01 K so near-identical inputs share a cache entry.
+@lru_cache(maxsize=2048)
+def _sat_vap_cached(fluid: str, T_K: float) -> tuple:
+    from CoolProp.CoolProp import QT_INPUTS
+    with _fluid_state_lock:
+        state = _fluid_state(fluid)
+        state.update(QT_INPUTS, 1.0, T_K)
+        return state.p(), state.hmass()
+
+def _psat(fluid: str, T_K: float) -> float:
+    """Saturated-vapour pressure in Pa."""
+    return _sat_vap_cached(fluid, round(T_K, 2))[0]
+
+def _hsat_vap(fluid: str, T_K: float) -> float:
+    """Saturated-vapour enthalpy in J/kg."""
+    return _sat_vap_cached(fluid, round(T_K, 2))[1]
+
+@lru_cache(maxsize=None)
+def _kA_chars():
+    """Evaporator kA characteristics, loaded from TESPy's defaults once per process."""
+    from tespy.tools.characteristics import CharLine
+    from tespy.tools.characteristics import load_default_char as ldc
+    return (ldc("heat exchanger", "kA_char1", "DEFAULT", CharLine),
+            ldc("heat exchanger", "kA_char2", "EVAPORATING FLUID", CharLine))
+
+@dataclass(frozen=True)
+class HPInputs:
+    working_fluid: str
+    T_source_in: float
+    T_source_out: float
+    T_sink_in: float
+    T_sink_out: float
+    duty_kW: float
+    ttd_su: float
+    ttd_ev: float
+    pr_hex: float
+    eta_pump: float
+    eta_s_default: float
+    two_stage: bool
+    map_name: Optional[str]  # which built-in map to use (or None)
+
+@dataclass
+class HPResults:
+    cop: Optional[float]
+    q_out_kW: float
+    w_comp_kW: float
+    w_pumps_kW: float
+    table_components: pd.DataFrame
+    table_connections: pd.DataFrame
+    states: pd.DataFrame  # one row per reported connection label: p_bar, T_C, h_kJkg
+
+class HeatPumpTESPy:
+    # Connection labels reported in HPResults.states, in display order
+    _STATE_LABELS = ("0", "1", "3", "5", "6", "7", "8", "9", "22", "23", "17", "19")
+
+    def __init__(self, hp_in: HPInputs, verbose: bool = False):
+        self.inp = hp_in
+        self.verbose = verbose  # print TESPy iteration info and result tables
+        self.cmap = StaticCompressorMap.from_name(hp_in.map_name) if hp_in.map_name else None
+
+    def _estimate_p_cond(self, T_cond_out_C: float) -> float:
+        return _psat(self.inp.working_fluid, c_to_k(T_cond_out_C)) / 1e5
+
+    def run(self) -> HPResults:
+        from tespy.networks import Network
+        from tespy.components import (
+            Condenser, CycleCloser, SimpleHeatExchanger, Pump, Sink, Source,
+            Valve, Drum, HeatExchanger, Compressor, Splitter, Merge
+        )
+        from tespy.connections import Connection
+
+        nw = Network(T_unit="C", p_unit="bar", h_unit="kJ / kg", m_unit="kg / s",
+                     iterinfo=self.verbose)
+        wf = self.inp.working_fluid
+        # TESPy copies fractions out of these on set_attr, so one dict per fluid is enough
+        wf_fluid = {wf: 1}
+        water = {"water": 1}
+
+        # --- Consumer loop ---
+        c_in = Source("refrigerant in")
+        cons_closer = CycleCloser("consumer cycle closer")
+        cd = Condenser("condenser")
+        rp = Pump("recirculation pump")
+        cons = SimpleHeatExchanger("consumer")
+        va_sink = Sink("valve (dummy sink)")
+
+        c0 = Connection(c_in, "out1", cd, "in1", label="0")
+        c1 = Connection(cd, "out1", va_sink, "in1", label="1")
+        c20 = Connection(cons_closer, "out1", rp, "in1", label="20")
+        c21 = Connection(rp, "out1", cd, "in2", label="21")
+        c22 = Connection(cd, "out2", cons, "in1", label="22")
+        c23 = Connection(cons, "out1", cons_closer, "in1", label="23")
+        nw.add_conns(c0, c1, c20, c21, c22, c23)
+
+        cd.set_attr(pr1=self.inp.pr_hex, pr2=self.inp.pr_hex)
+        rp.set_attr(eta_s=self.inp.eta_pump)
+        cons.set_attr(pr=self.inp.pr_hex)
+
+        p_cond = self._estimate_p_cond(self.inp.T_sink_out)
+        c0.set_attr(T=max(self.inp.T_sink_out + 60, 50), p=p_cond, fluid=wf_fluid)
+        c20.set_attr(T=self.inp.T_sink_in, p=2.0, fluid=water)
+        c22.set_attr(T=self.inp.T_sink_out)
+        cons.set_attr(Q=-abs(self.inp.duty_kW) * 1e3)
+        nw.solve("design", print_results=self.verbose)
+
+        # --- Evaporator & superheater ---
+        amb_in = Source("source ambient")
+        amb_out = Sink("sink ambient")
+        va = Valve("valve")
+        dr = Drum("drum")
+        ev = HeatExchanger("evaporator")
+        su = HeatExchanger("superheater")
+        cp1_sink = Sink("cp1 dummy sink")
+
+        nw.del_conns(c1)
+        c1 = Connection(cd, "out1", va, "in1", label="1")
+        c2 = Connection(va, "out1", dr, "in1", label="2")
+        c3 = Connection(dr, "out1", ev, "in2", label="3")
+        c4 = Connection(ev, "out2", dr, "in2", label="4")
+        c5 = Connection(dr, "out2", su, "in2", label="5")
+        c6 = Connection(su, "out2", cp1_sink, "in1", label="6")
+        nw.add_conns(c1, c2, c3, c4, c5, c6)
+
+        c17 = Connection(amb_in, "out1", su, "in1", label="17")
+        c18 = Connection(su, "out1", ev, "in1", label="18")
+        c19 = Connection(ev, "out1", amb_out, "in1", label="19")
+        nw.add_conns(c17, c18, c19)
+
+        ev.set_attr(pr1=self.inp.pr_hex)
+        su.set_attr(pr1=self.inp.pr_hex, pr2=self.inp.pr_hex)
+
+        c4.set_attr(x=0.9, T=self.inp.T_source_out)
+        h_sat = _hsat_vap(wf, c_to_k(self.inp.T_source_out + self.inp.ttd_su)) / 1e3
+        c6.set_attr(h=h_sat)
+        c17.set_attr(T=self.inp.T_source_in, fluid=water)
+        c19.set_attr(T=self.inp.T_source_out, p=1.013)
+        nw.solve("design", print_results=self.verbose)
+
+        # --- Compression & intercooling ---
+        cp1 = Compressor("compressor 1")
+        cp2 = Compressor("compressor 2") if self.inp.two_stage else None
+        ic = HeatExchanger("intercooler")
+        hsp = Pump("heat source pump")
+        sp = Splitter("splitter")
+        me = Merge("merge")
+        cv = Valve("control valve")
+        hs = Source("ambient intake")
+        cc = CycleCloser("hp cycle closer")
+
+        nw.del_conns(c0, c6, c17)
+        c6 = Connection(su, "out2", cp1, "in1", label="6")
+        c7 = Connection(cp1, "out1", ic, "in1", label="7")
+        if self.inp.two_stage:
+            c8 = Connection(ic, "out1", cp2, "in1", label="8")
+            c9 = Connection(cp2, "out1", cc, "in1", label="9")
+        else:
+            c8 = Connection(ic, "out1", cc, "in1", label="8")
+            c9 = c8
+        c0 = Connection(cc, "out1", cd, "in1", label="0")
+
+        c11 = Connection(hs, "out1", hsp, "in1", label="11")
+        c12 = Connection(hsp, "out1", sp, "in1", label="12")
+        c13 = Connection(sp, "out1", ic, "in2", label="13")
+        c14 = Connection(ic, "out2", me, "in1", label="14")
+        c15 = Connection(sp, "out2", cv, "in1", label="15")
+        c16 = Connection(cv, "out1", me, "in2", label="16")
+        c17 = Connection(me, "out1", su, "in1", label="17")
+        # Single stage aliases c9 to c8, which must only be added once
+        nw.add_conns(*dict.fromkeys((c6, c7, c8, c9, c0, c11, c12, c13, c14, c15, c16, c17)))
+
+        cp1.set_attr(pr=2.0)  # rough seed; gets refined
+        if cp2:
+            cp2.set_attr(pr=2.0)
+        ic.set_attr(pr1=self.inp.pr_hex, pr2=self.inp.pr_hex)
+        hsp.set_attr(eta_s=self.inp.eta_pump)
+
+        c0.set_attr(p=p_cond, fluid=wf_fluid)
+        su.set_attr(ttd_u=self.inp.ttd_su)
+        ev.set_attr(ttd_l=self.inp.ttd_ev)
+        cd.set_attr(ttd_u=self.inp.ttd_su)
+
+        # initial design eta_s
+        cp1.set_attr(eta_s=self.inp.eta_s_default)
+        if cp2:
+            cp2.set_attr(eta_s=self.inp.eta_s_default)
+        nw.solve("design", print_results=self.verbose)
+
+        # offdesign config like typical TESPy pattern
+        cp1.set_attr(design=["eta_s"], offdesign=["eta_s_char"])
+        if cp2:
+            cp2.set_attr(design=["eta_s"], offdesign=["eta_s_char"])
+        rp.set_attr(design=["eta_s"], offdesign=["eta_s_char"])
+        hsp.set_attr(design=["eta_s"], offdesign=["eta_s_char"])
+
+        cons.set_attr(design=["pr"], offdesign=["zeta"])
+        cd.set_attr(design=["pr2", "ttd_u"], offdesign=["zeta2", "kA_char"])
+
+        kA_char1, kA_char2 = _kA_chars()
+        ev.set_attr(kA_char1=kA_char1, kA_char2=kA_char2,
+                    design=["pr1", "ttd_l"], offdesign=["zeta1", "kA_char"])
+        su.set_attr(design=["pr1", "pr2", "ttd_u"], offdesign=["zeta1", "zeta2", "kA_char"])
+        ic.set_attr(design=["pr1", "pr2"], offdesign=["zeta1", "zeta2", "kA_char"])
+        c14.set_attr(design=["T"])
+
+        # Apply built-in map to update eta_s from actual PR
+        stages = [(cp1, c6, c7)]
+        if cp2:
+            stages.append((cp2, c8, c9))
+
+        # eta_s is a design parameter, so TESPy unsets it on every offdesign
+        # solve and cp.eta_s.val afterwards comes from eta_s_char. Convergence
+        # is therefore judged against the value the map set on the last pass.
+        last_map_eta: Dict[int, float] = {}
+
+        def apply_map_eta() -> float:
+            """Set eta_s from the map; returns the largest change since the last pass."""
+            if not self.cmap:
+                return 0.0
+            # Protect against None values during the first offdesign pass
+            active = [(i, cp, c_in, c_out) for i, (cp, c_in, c_out) in enumerate(stages)
+                      if c_in.p.val and c_out.p.val]
+            if not active:
+                return 0.0
+            prs = np.array([c_out.p.val / c_in.p.val for _, _, c_in, c_out in active])
+            etas = self.cmap.eta_s_many(prs, self.inp.eta_s_default)
+            d_eta = 0.0
+            for (i, cp, _, _), eta in zip(active, etas):
+                eta = float(eta)
+                d_eta = max(d_eta, abs(eta - last_map_eta.get(i, float("inf"))))
+                last_map_eta[i] = eta
+                cp.set_attr(eta_s=eta)
+            return d_eta
+
+        apply_map_eta()
+        nw.solve("offdesign", design_path=None, print_results=self.verbose)
+        # Re-solve only while the map still moves eta_s
+        for _ in range(MAP_MAX_ITER):
+            if apply_map_eta() < MAP_ETA_TOL:
+                break
+            nw.solve("offdesign", design_path=None, print_results=self.verbose)
+
+        # KPIs
+        q_out = abs(cons.Q.val) / 1e3
+        # [cp1, cp2, rp, hsp]; unsolved or absent units count as zero power
+        power = np.fromiter(
+            ((cp.P.val or 0.0) if cp else 0.0 for cp in (cp1, cp2, rp, hsp)),
+            dtype=np.float64, count=4,
+        )
+        w_comp = float(power[:2].sum()) / 1e3
+        w_pumps = float(power[2:].sum()) / 1e3
+        w_in = w_comp + w_pumps
+        cop = (q_out / w_in) if w_in > 0 else None
+
+        # Nothing downstream mutates these frames, so hand them over without copying
+        comp_tbl = nw.results.get("components", pd.DataFrame())
+        conn_tbl = nw.results.get("connections", pd.DataFrame())
+
+        conns = (c0, c1, c3, c5, c6, c7, c8, c9, c22, c23, c17, c19)
+        n = len(conns)
+        p = np.fromiter((np.nan if c.p.val is None else c.p.val for c in conns), dtype=np.float64, count=n)
+        T = np.fromiter((np.nan if c.T.val is None else c.T.val for c in conns), dtype=np.float64, count=n)
+        h = np.fromiter((np.nan if c.h.val is None else c.h.val for c in conns), dtype=np.float64, count=n)
+        states = pd.DataFrame({"p_bar": p, "T_C": T, "h_kJkg": h}, index=list(self._STATE_LABELS))
+
+        return HPResults(
+            cop=cop,
+            q_out_kW=q_out,
+            w_comp_kW=w_comp,
+            w_pumps_kW=w_pumps,
+            table_components=comp_tbl,
+            table_connections=conn_tbl,
+            states=states,
+        )
+
+def run_simulation(hp_in: HPInputs, verbose: bool = False) -> HPResults:
+    """Build, solve and post-process the heat pump for one set of inputs."""
+    return HeatPumpTESPy(hp_in, verbose=verbose).run()
+
+def _solve_one(hp_in: HPInputs) -> Optional[HPResults]:
+    # A case that fails to converge yields None instead of aborting the sweep.
+    try:
+        return run_simulation(hp_in)
+    except Exception:
+        return None
+
+def run_sweep(cases: List[HPInputs]) -> List[Optional[HPResults]]:
+    """Solve independent cases in worker processes; results keep the order of `cases`.
+
+    TESPy solves are CPU-bound Python, so processes (not threads) are used. Workers
+    are spawned rather than forked: the caller is usually Streamlit's multithreaded
+    server, and forking it can deadlock on locks held by other threads.
+    """
+    if not cases:
+        return []
+    with ProcessPoolExecutor(max_workers=min(len(cases), os.cpu_count() or 1),
+                             mp_context=multiprocessing.get_context("spawn")) as ex:
+        return list(ex.map(_solve_one, cases))